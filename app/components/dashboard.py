@@ -1,110 +1,125 @@
 import streamlit as st
 import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
 from typing import List, Optional
 
+# Upper bound on points shipped to the browser per trace
+MAX_CHART_POINTS = 2000
+
+# Bucket aggregation for OHLCV columns; every other column keeps its last value
+_OHLCV_AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+def downsample_for_chart(df: Optional[pd.DataFrame], max_points: int = MAX_CHART_POINTS) -> Optional[pd.DataFrame]:
+    """Aggregate rows into at most max_points buckets before plotting"""
+    if df is None or len(df) <= max_points:
+        return df
+    
+    step = int(np.ceil(len(df) / max_points))
+    buckets = np.arange(len(df)) // step
+    agg = {col: _OHLCV_AGG.get(col, 'last') for col in df.columns}
+    
+    sampled = df.groupby(buckets).agg(agg)
+    sampled.index = df.index[::step]
+    return sampled
+
 def render_market_metrics(market_summary: dict):
     """Render market metrics in columns"""
+    # Read each summary field once
+    price = float(market_summary.get('price', 0) or 0)
+    price_change_24h = float(market_summary.get('price_change_24h', 0) or 0)
+    rsi = float(market_summary.get('rsi', 0) or 0)
+    rsi_state = 'Overbought' if rsi > 70 else 'Oversold' if rsi < 30 else 'Neutral'
+    macd_signal = market_summary.get('macd_signal', 'N/A')
+    volume_24h = float(market_summary.get('volume_24h', 0) or 0)
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric(
-            "Price",
-            f"${market_summary.get('price', 0):,.2f}",
-            f"{market_summary.get('price_change_24h', 0):.2f}%"
-        )
+        st.metric("Price", f"${price:,.2f}", f"{price_change_24h:.2f}%")
     
     with col2:
-        st.metric(
-            "RSI",
-            f"{market_summary.get('rsi', 0):.2f}",
-            "Overbought" if market_summary.get('rsi', 0) > 70 else "Oversold" if market_summary.get('rsi', 0) < 30 else "Neutral"
-        )
+        st.metric("RSI", f"{rsi:.2f}", rsi_state)
     
     with col3:
-        st.metric(
-            "MACD Signal",
-            market_summary.get('macd_signal', 'N/A').title()
-        )
+        st.metric("MACD Signal", macd_signal.title())
     
     with col4:
-        st.metric(
-            "24h Volume",
-            f"${market_summary.get('volume_24h', 0):,.0f}"
-        )
+        st.metric("24h Volume", f"${volume_24h:,.0f}")
 
 def create_price_chart(df: pd.DataFrame, selected_crypto: str, indicators: List[str]) -> go.Figure:
     """Create price chart with selected indicators"""
-    fig = go.Figure()
+    df = downsample_for_chart(df)
     
-    # Add candlestick chart
-    fig.add_trace(go.Candlestick(
+    # Candlestick chart
+    traces = [go.Candlestick(
         x=df.index,
         open=df['open'],
         high=df['high'],
         low=df['low'],
         close=df['close'],
         name=selected_crypto
-    ))
+    )]
     
-    # Add indicators
+    # Indicators
     if 'Moving Averages' in indicators:
-        for ma in ['MA20', 'MA50', 'MA200']:
-            if ma in df.columns:
-                fig.add_trace(go.Scatter(
-                    x=df.index, y=df[ma],
-                    name=ma, line=dict(width=1)
-                ))
+        traces.extend(
+            go.Scatter(x=df.index, y=df[ma], name=ma, line=dict(width=1))
+            for ma in ['MA20', 'MA50', 'MA200'] if ma in df.columns
+        )
     
     if 'Bollinger Bands' in indicators:
-        for band in ['BB_Upper', 'BB_Middle', 'BB_Lower']:
-            if band in df.columns:
-                fig.add_trace(go.Scatter(
-                    x=df.index, y=df[band],
-                    name=band, line=dict(width=1, dash='dash')
-                ))
+        traces.extend(
+            go.Scatter(x=df.index, y=df[band], name=band, line=dict(width=1, dash='dash'))
+            for band in ['BB_Upper', 'BB_Middle', 'BB_Lower'] if band in df.columns
+        )
     
-    # Update layout
-    fig.update_layout(
-        height=600,
-        template='plotly_dark',
-        xaxis_rangeslider_visible=False,
-        showlegend=True
+    # Build the figure once with its layout
+    return go.Figure(
+        data=traces,
+        layout=go.Layout(
+            height=600,
+            template='plotly_dark',
+            xaxis_rangeslider_visible=False,
+            showlegend=True
+        )
     )
-    
-    return fig
 
 def create_indicator_charts(df: pd.DataFrame, indicators: List[str]) -> dict:
     """Create technical indicator charts"""
+    df = downsample_for_chart(df)
     charts = {}
     
     if 'RSI' in indicators:
-        fig_rsi = go.Figure()
-        fig_rsi.add_trace(go.Scatter(
-            x=df.index, y=df['RSI'],
-            name='RSI', line=dict(color='purple', width=2)
-        ))
+        fig_rsi = go.Figure(
+            data=[go.Scatter(
+                x=df.index, y=df['RSI'],
+                name='RSI', line=dict(color='purple', width=2)
+            )],
+            layout=go.Layout(height=300, template='plotly_dark')
+        )
         fig_rsi.add_hline(y=70, line_dash="dash", line_color="red")
         fig_rsi.add_hline(y=30, line_dash="dash", line_color="green")
-        fig_rsi.update_layout(height=300, template='plotly_dark')
         charts['RSI'] = fig_rsi
     
     if 'MACD' in indicators:
-        fig_macd = go.Figure()
-        fig_macd.add_trace(go.Scatter(
-            x=df.index, y=df['MACD'],
-            name='MACD', line=dict(color='blue', width=2)
-        ))
-        fig_macd.add_trace(go.Scatter(
-            x=df.index, y=df['MACD_Signal'],
-            name='Signal', line=dict(color='orange', width=2)
-        ))
-        fig_macd.add_bar(
-            x=df.index, y=df['MACD_Hist'],
-            name='Histogram'
+        charts['MACD'] = go.Figure(
+            data=[
+                go.Scatter(
+                    x=df.index, y=df['MACD'],
+                    name='MACD', line=dict(color='blue', width=2)
+                ),
+                go.Scatter(
+                    x=df.index, y=df['MACD_Signal'],
+                    name='Signal', line=dict(color='orange', width=2)
+                ),
+                go.Bar(
+                    x=df.index, y=df['MACD_Hist'],
+                    name='Histogram'
+                )
+            ],
+            layout=go.Layout(height=300, template='plotly_dark')
         )
-        fig_macd.update_layout(height=300, template='plotly_dark')
-        charts['MACD'] = fig_macd
     
     return charts
 
@@ -1,39 +1,39 @@
 import os
 from dotenv import load_dotenv
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
 
 # Load environment variables
 load_dotenv()
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class APIConfig:
     """API Configuration settings"""
     alpha_vantage_key: str = os.getenv('ALPHA_VANTAGE_API_KEY', '')
     news_api_key: str = os.getenv('NEWS_API_KEY', '')
     base_url: str = "https://www.alphavantage.co/query"
     
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DatabaseConfig:
     """Database Configuration settings"""
     data_dir: str = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
     raw_dir: str = os.path.join(data_dir, 'raw')
     processed_dir: str = os.path.join(data_dir, 'processed')
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CryptoConfig:
     """Cryptocurrency Configuration settings"""
-    default_symbols: List[str] = ('BTC', 'ETH', 'BNB', 'XRP', 'ADA')
+    default_symbols: Tuple[str, ...] = field(default_factory=lambda: ('BTC', 'ETH', 'BNB', 'XRP', 'ADA'))
     update_interval: int = 60  # seconds
     historical_days: int = 365
-    technical_indicators: List[str] = ('RSI', 'MACD', 'EMA')
+    technical_indicators: Tuple[str, ...] = field(default_factory=lambda: ('RSI', 'MACD', 'EMA'))
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AppConfig:
     """Main Application Configuration"""
-    api: APIConfig = APIConfig()
-    db: DatabaseConfig = DatabaseConfig()
-    crypto: CryptoConfig = CryptoConfig()
+    api: APIConfig = field(default_factory=APIConfig)
+    db: DatabaseConfig = field(default_factory=DatabaseConfig)
+    crypto: CryptoConfig = field(default_factory=CryptoConfig)
     debug: bool = os.getenv('DEBUG', 'False').lower() == 'true'
     log_dir: str = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
 
@@ -1,3 +1,5 @@
+import threading
+import time
 import streamlit as st
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
@@ -5,8 +7,9 @@ import pandas as pd
 
 from services.data_service import crypto_data_service
 from services.analysis_service import analysis_service
-from services.llm_service import llm_service
+from services.llm_service import llm_service, ANALYSIS_UNAVAILABLE
 from services.forecast_service import forecast_service
+from components.dashboard import downsample_for_chart
 from config.config import config
 
 # Page configuration
@@ -27,45 +30,80 @@ if 'chat_messages' not in st.session_state:
     st.session_state['chat_messages'] = []
 
 # Cache functions
-@st.cache_data(ttl=600)  # Cache for 10 minutes
-def get_ai_analysis(selected_crypto):
-    return analysis_service.generate_market_analysis(selected_crypto)
+@st.cache_data(persist="disk", max_entries=16)
+def _cached_ai_analysis(selected_crypto, analysis_key, _market_data):
+    return analysis_service.generate_market_analysis(selected_crypto, _market_data)
+
+def get_ai_analysis(selected_crypto, market_data):
+    # Keyed on the analysis inputs rather than time, so a restart reuses the
+    # persisted entry and new files are only written when the inputs change
+    analysis_key = analysis_service.get_analysis_key(selected_crypto, market_data)
+    analysis = _cached_ai_analysis(selected_crypto, analysis_key, market_data)
+    if not analysis or analysis.get('llm_analysis') == ANALYSIS_UNAVAILABLE:
+        # Don't persist a failed generation
+        _cached_ai_analysis.clear(selected_crypto, analysis_key, market_data)
+    return analysis
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes
 def get_market_data(selected_crypto, force_update=False):
     return crypto_data_service.get_market_summary(selected_crypto, force_update)
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+HISTORICAL_TTL = 300  # Cache for 5 minutes
+
+@st.cache_resource
+def _historical_store():
+    """Shared {symbol: {'df', 'fetched'}} container, handed out by reference"""
+    return {}
+
 def get_historical_data(selected_crypto):
-    return crypto_data_service.get_historical_data(selected_crypto)
+    """Return the shared historical frame for a symbol (treat as read-only)"""
+    store = _historical_store()
+    entry = store.get(selected_crypto)
+    if entry is None or time.time() - entry['fetched'] > HISTORICAL_TTL:
+        df = crypto_data_service.get_historical_data(selected_crypto)
+        # Coerce the index once per fetch so range filtering can slice directly
+        if df is not None:
+            if not isinstance(df.index, pd.DatetimeIndex):
+                df.index = pd.to_datetime(df.index)
+            # float32 is plenty for charting and halves the frame and chart payload
+            df = df.astype({col: 'float32' for col in df.select_dtypes('float64').columns})
+        entry = {'df': df, 'fetched': time.time()}
+        store[selected_crypto] = entry
+    return entry['df']
 
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
+@st.cache_resource
+def _warm_news_cache(day):
+    """Prefetch news for all default symbols in the background, once per day"""
+    thread = threading.Thread(
+        target=analysis_service.prefetch_news,
+        args=(list(config.crypto.default_symbols),),
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+def _frame_fingerprint(df):
+    """Cheap content key for a historical frame: size, last date and last close"""
+    if df.empty:
+        return (0, None, None)
+    return (len(df), df.index[-1].value, float(df['close'].iat[-1]))
+
+@st.cache_data(ttl=1800, hash_funcs={pd.DataFrame: _frame_fingerprint})  # Cache for 30 minutes
 def get_forecast_data(df, horizon):
     return forecast_service.generate_forecast(df=df, h=horizon)
 
+# Lookback window in days for each time range option
+_RANGE_DAYS = {'1D': 1, '1W': 7, '1M': 30, '3M': 90, '6M': 180, '1Y': 365}
+
+@st.cache_resource(ttl=300, hash_funcs={pd.DataFrame: _frame_fingerprint})  # Cache for 5 minutes
 def filter_data_by_range(df, time_range):
     """Filter dataframe based on selected time range"""
     if df is None or df.empty:
         return None
-        
-    if not isinstance(df.index, pd.DatetimeIndex):
-        df.index = pd.to_datetime(df.index)
     
-    end_date = pd.Timestamp.now()
-    if time_range == '1D':
-        start_date = end_date - pd.Timedelta(days=1)
-    elif time_range == '1W':
-        start_date = end_date - pd.Timedelta(weeks=1)
-    elif time_range == '1M':
-        start_date = end_date - pd.Timedelta(days=30)
-    elif time_range == '3M':
-        start_date = end_date - pd.Timedelta(days=90)
-    elif time_range == '6M':
-        start_date = end_date - pd.Timedelta(days=180)
-    else:  # 1Y
-        start_date = end_date - pd.Timedelta(days=365)
-    
-    return df[df.index >= start_date]
+    # Index is sorted, so a binary search finds the window start
+    start_date = pd.Timestamp.now() - pd.Timedelta(days=_RANGE_DAYS.get(time_range, 365))
+    return df.iloc[df.index.searchsorted(start_date):]
 
 def render_analysis_section(analysis_data: dict):
     """Render the market analysis section"""
@@ -78,53 +116,48 @@ def render_analysis_section(analysis_data: dict):
     with st.expander("View Detailed AI Analysis", expanded=True):
         st.markdown(analysis_data.get('llm_analysis', 'Analysis not available'))
     
+    # Pull the nested sections out once
+    tech = analysis_data.get('technical_indicators', {})
+    price = analysis_data.get('price_analysis', {})
+    sent = analysis_data.get('market_sentiment', {})
+    
+    technical_metrics = [
+        ("RSI Condition", tech.get('rsi_condition', 'N/A')),
+        ("MACD Signal", tech.get('macd_signal', 'N/A').title()),
+        ("Trend", price.get('trend', 'N/A').title()),
+    ]
+    market_metrics = [
+        ("Price Change (24h)", f"{price.get('price_change_24h', 0):.2f}%"),
+        ("Market Sentiment", sent.get('news_sentiment', 'N/A')),
+    ]
+    
     # Technical Analysis and News in Tabs
     tab1, tab2, tab3 = st.tabs(["Technical Analysis", "Market Metrics", "News"])
     
     with tab1:
         st.write("### Technical Indicators")
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric(
-                "RSI Condition",
-                analysis_data['technical_indicators']['rsi_condition']
-            )
-        with col2:
-            st.metric(
-                "MACD Signal",
-                analysis_data['technical_indicators']['macd_signal'].title()
-            )
-        with col3:
-            st.metric(
-                "Trend",
-                analysis_data['price_analysis']['trend'].title()
-            )
+        for col, (label, value) in zip(st.columns(len(technical_metrics)), technical_metrics):
+            with col:
+                st.metric(label, value)
     
     with tab2:
         st.write("### Market Metrics")
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.metric(
-                "Price Change (24h)",
-                f"{analysis_data['price_analysis']['price_change_24h']:.2f}%"
-            )
-        with col2:
-            st.metric(
-                "Market Sentiment",
-                analysis_data['market_sentiment']['news_sentiment']
-            )
+        for col, (label, value) in zip(st.columns(len(market_metrics)), market_metrics):
+            with col:
+                st.metric(label, value)
     
     with tab3:
         st.write("### Recent News")
-        for news in analysis_data['market_sentiment']['latest_news']:
+        for news in sent.get('latest_news', []):
             with st.expander(news['title'], expanded=False):
-                st.write(f"**Source:** {news['source']}")
-                st.write(f"**Published:** {news['timestamp']}")
-                st.write(f"**Sentiment:** {news['sentiment_label']}")
-                st.write(news['summary'])
-                st.markdown(f"[Read more]({news['url']})")
+                # One markdown element per article instead of five
+                st.markdown(
+                    f"**Source:** {news['source']}\n\n"
+                    f"**Published:** {news['timestamp']}\n\n"
+                    f"**Sentiment:** {news['sentiment_label']}\n\n"
+                    f"{news['summary']}\n\n"
+                    f"[Read more]({news['url']})"
+                )
 
 def main():
     # Sidebar
@@ -139,6 +172,7 @@ def main():
         if st.button("Force Update Data"):
             st.session_state['force_update'] = True
             st.cache_data.clear()
+            _historical_store().clear()
         
         st.divider()
         
@@ -157,6 +191,9 @@ def main():
             default=['RSI', 'MACD']
         )
 
+    # Warm the news cache for the other symbols in the sidebar
+    _warm_news_cache(datetime.now().date().isoformat())
+
     # Main content
     col1, col2, col3, col4 = st.columns(4)
     
@@ -166,40 +203,34 @@ def main():
     if st.session_state['force_update']:
         st.session_state['force_update'] = False
 
+    # Read each market field once
+    price = float(market_data.get('price', 0) or 0)
+    price_change_24h = float(market_data.get('price_change_24h', 0) or 0)
+    rsi_value = float(market_data.get('rsi', 0) or 0)
+    rsi_color, rsi_state = (
+        ("🔴", "Overbought") if rsi_value > 70 else
+        ("🟢", "Oversold") if rsi_value < 30 else
+        ("⚪", "Neutral")
+    )
+    macd_signal = market_data.get('macd_signal', 'N/A')
+    signal_color = "🟢" if macd_signal == 'bullish' else "🔴"
+    volume_24h = float(market_data.get('volume_24h', 0) or 0)
+
     # Display metrics
     with col1:
-        st.metric(
-            "Price",
-            f"${market_data.get('price', 0):,.2f}",
-            f"{market_data.get('price_change_24h', 0):.2f}%"
-        )
+        st.metric("Price", f"${price:,.2f}", f"{price_change_24h:.2f}%")
     
     with col2:
-        rsi_value = market_data.get('rsi', 0)
-        rsi_color = (
-            "🔴" if rsi_value > 70 else 
-            "🟢" if rsi_value < 30 else 
-            "⚪"
-        )
-        st.metric(
-            "RSI",
-            f"{rsi_color} {rsi_value:.2f}",
-            "Overbought" if rsi_value > 70 else "Oversold" if rsi_value < 30 else "Neutral"
-        )
+        st.metric("RSI", f"{rsi_color} {rsi_value:.2f}", rsi_state)
     
     with col3:
-        macd_signal = market_data.get('macd_signal', 'N/A')
-        signal_color = "🟢" if macd_signal == 'bullish' else "🔴"
-        st.metric(
-            "MACD Signal",
-            f"{signal_color} {macd_signal.title()}"
-        )
+        st.metric("MACD Signal", f"{signal_color} {macd_signal.title()}")
     
     with col4:
-        st.metric(
-            "24h Volume",
-            f"${market_data.get('volume_24h', 0):,.0f}"
-        )
+        st.metric("24h Volume", f"${volume_24h:,.0f}")
+
+    # Fetch the shared historical frame once for both the chart and forecast tabs
+    df_full = get_historical_data(selected_crypto)
 
     # Create main tabs
     tab1, tab2, tab3 = st.tabs(["📈 Charts", "🔮 Forecast", "🤖 AI Analysis"])
@@ -207,53 +238,54 @@ def main():
     with tab1:
         # Price chart
         st.subheader(f"{selected_crypto}/USD Price Chart")
-        df = get_historical_data(selected_crypto)
-        df = filter_data_by_range(df, st.session_state['time_range'])
+        df = downsample_for_chart(filter_data_by_range(df_full, st.session_state['time_range']))
         
         if df is not None:
-            # Create price chart
-            fig = go.Figure()
-            
-            # Add candlestick chart
-            fig.add_trace(go.Candlestick(
+            # Candlestick chart
+            traces = [go.Candlestick(
                 x=df.index,
                 open=df['open'],
                 high=df['high'],
                 low=df['low'],
                 close=df['close'],
                 name=selected_crypto
-            ))
+            )]
             
             # Add indicators based on selection
             if 'Moving Averages' in indicators:
                 ma_colors = {'MA20': 'blue', 'MA50': 'orange', 'MA200': 'red'}
-                for ma, color in ma_colors.items():
-                    if ma in df.columns:
-                        fig.add_trace(go.Scatter(
-                            x=df.index, 
-                            y=df[ma],
-                            name=ma, 
-                            line=dict(color=color, width=1)
-                        ))
+                traces.extend(
+                    go.Scatter(
+                        x=df.index, 
+                        y=df[ma],
+                        name=ma, 
+                        line=dict(color=color, width=1)
+                    )
+                    for ma, color in ma_colors.items() if ma in df.columns
+                )
             
             if 'Bollinger Bands' in indicators:
-                for band, color in [('BB_Upper', 'gray'), ('BB_Lower', 'gray')]:
-                    if band in df.columns:
-                        fig.add_trace(go.Scatter(
-                            x=df.index, 
-                            y=df[band],
-                            name=band, 
-                            line=dict(color=color, width=1, dash='dash')
-                        ))
+                traces.extend(
+                    go.Scatter(
+                        x=df.index, 
+                        y=df[band],
+                        name=band, 
+                        line=dict(color=color, width=1, dash='dash')
+                    )
+                    for band, color in [('BB_Upper', 'gray'), ('BB_Lower', 'gray')] if band in df.columns
+                )
             
-            # Update layout
-            fig.update_layout(
-                height=600,
-                template='plotly_dark',
-                xaxis_rangeslider_visible=False,
-                showlegend=True,
-                yaxis_title='Price (USD)',
-                xaxis_title='Date'
+            # Build the figure once with its layout
+            fig = go.Figure(
+                data=traces,
+                layout=go.Layout(
+                    height=600,
+                    template='plotly_dark',
+                    xaxis_rangeslider_visible=False,
+                    showlegend=True,
+                    yaxis_title='Price (USD)',
+                    xaxis_title='Date'
+                )
             )
             
             st.plotly_chart(fig, use_container_width=True)
@@ -264,48 +296,52 @@ def main():
                 
                 with indicator_tab1:
                     if 'RSI' in indicators:
-                        fig_rsi = go.Figure()
-                        fig_rsi.add_trace(go.Scatter(
-                            x=df.index, 
-                            y=df['RSI'],
-                            name='RSI', 
-                            line=dict(color='purple', width=2)
-                        ))
+                        fig_rsi = go.Figure(
+                            data=[go.Scatter(
+                                x=df.index, 
+                                y=df['RSI'],
+                                name='RSI', 
+                                line=dict(color='purple', width=2)
+                            )],
+                            layout=go.Layout(
+                                height=300, 
+                                template='plotly_dark',
+                                yaxis_title='RSI',
+                                xaxis_title='Date'
+                            )
+                        )
                         fig_rsi.add_hline(y=70, line_dash="dash", line_color="red", annotation_text="Overbought")
                         fig_rsi.add_hline(y=30, line_dash="dash", line_color="green", annotation_text="Oversold")
-                        fig_rsi.update_layout(
-                            height=300, 
-                            template='plotly_dark',
-                            yaxis_title='RSI',
-                            xaxis_title='Date'
-                        )
                         st.plotly_chart(fig_rsi, use_container_width=True)
                 
                 with indicator_tab2:
                     if 'MACD' in indicators:
-                        fig_macd = go.Figure()
-                        fig_macd.add_trace(go.Scatter(
-                            x=df.index, 
-                            y=df['MACD'],
-                            name='MACD', 
-                            line=dict(color='blue', width=2)
-                        ))
-                        fig_macd.add_trace(go.Scatter(
-                            x=df.index, 
-                            y=df['MACD_Signal'],
-                            name='Signal', 
-                            line=dict(color='orange', width=2)
-                        ))
-                        fig_macd.add_bar(
-                            x=df.index, 
-                            y=df['MACD_Hist'],
-                            name='Histogram'
-                        )
-                        fig_macd.update_layout(
-                            height=300, 
-                            template='plotly_dark',
-                            yaxis_title='MACD',
-                            xaxis_title='Date'
+                        fig_macd = go.Figure(
+                            data=[
+                                go.Scatter(
+                                    x=df.index, 
+                                    y=df['MACD'],
+                                    name='MACD', 
+                                    line=dict(color='blue', width=2)
+                                ),
+                                go.Scatter(
+                                    x=df.index, 
+                                    y=df['MACD_Signal'],
+                                    name='Signal', 
+                                    line=dict(color='orange', width=2)
+                                ),
+                                go.Bar(
+                                    x=df.index, 
+                                    y=df['MACD_Hist'],
+                                    name='Histogram'
+                                )
+                            ],
+                            layout=go.Layout(
+                                height=300, 
+                                template='plotly_dark',
+                                yaxis_title='MACD',
+                                xaxis_title='Date'
+                            )
                         )
                         st.plotly_chart(fig_macd, use_container_width=True)
 
@@ -323,17 +359,16 @@ def main():
                 step=1
             )
         
-        # Get data and generate forecast
-        df = get_historical_data(selected_crypto)
-        if df is not None:
+        # Generate forecast from the full history
+        if df_full is not None:
             with st.spinner("Generating forecast..."):
                 # Use cached forecast function
-                forecast_result = get_forecast_data(df, horizon)
+                forecast_result = get_forecast_data(df_full, horizon)
                 
                 if forecast_result:
                     # Display forecast plot
                     forecast_fig = forecast_service.create_forecast_plot(
-                        df, forecast_result, selected_crypto
+                        df_full, forecast_result, selected_crypto
                     )
                     if forecast_fig:
                         st.plotly_chart(forecast_fig, use_container_width=True)
@@ -360,7 +395,7 @@ def main():
     
     with tab3:
         # AI Analysis
-        analysis_data = get_ai_analysis(selected_crypto)
+        analysis_data = get_ai_analysis(selected_crypto, market_data)
         render_analysis_section(analysis_data)
 
     # Chat Interface
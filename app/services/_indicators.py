@@ -0,0 +1,135 @@
+from typing import Dict, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config.config import TECHNICAL_PARAMS
+from services._njit import njit
+
+RSI_WINDOW = TECHNICAL_PARAMS['RSI']['timeperiod']
+MACD_FAST = TECHNICAL_PARAMS['MACD']['fastperiod']
+MACD_SLOW = TECHNICAL_PARAMS['MACD']['slowperiod']
+MACD_SIGNAL = TECHNICAL_PARAMS['MACD']['signalperiod']
+BB_WINDOW = 20
+BB_DEV = 2.0
+
+# Column names, in the order compute_indicators returns them
+INDICATOR_COLUMNS = (
+    'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist',
+    'MA20', 'MA50', 'MA200',
+    'BB_Upper', 'BB_Middle', 'BB_Lower'
+)
+
+def _sma(close: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average from cumulative sums; NaN unless the whole window is valid"""
+    out = np.full(close.size, np.nan)
+    if close.size >= window:
+        # NaNs add nothing to the sums and are counted out, so they only blank their own windows
+        valid = ~np.isnan(close)
+        csum = np.concatenate(([0.0], np.cumsum(np.where(valid, close, 0.0))))
+        ccount = np.concatenate(([0], np.cumsum(valid)))
+        full = ccount[window:] - ccount[:-window] == window
+        out[window - 1:] = np.where(full, (csum[window:] - csum[:-window]) / window, np.nan)
+    return out
+
+def _bollinger(close: np.ndarray, window: int = BB_WINDOW, dev: float = BB_DEV) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Population-stdev Bollinger Bands; NaN unless the whole window is valid"""
+    middle = _sma(close, window)
+    # Two-pass stdev per window; E[x^2] - E[x]^2 from running sums cancels badly
+    # once prices span orders of magnitude
+    std = np.full(close.size, np.nan)
+    if close.size >= window:
+        std[window - 1:] = sliding_window_view(close, window).std(axis=1)
+    return middle + dev * std, middle, middle - dev * std
+
+@njit(cache=True)
+def _ewm_step(weighted, old_wt, x, alpha):
+    """One adjust=False EWM update with pandas' NaN handling (ignore_na=False).
+
+    A NaN input leaves the average unchanged but still decays its weight, so
+    the next valid value counts for more. Returns the new (weighted, old_wt).
+    """
+    if np.isnan(weighted):
+        # Not seeded yet: the first valid value starts the average
+        return x, 1.0
+    old_wt *= 1.0 - alpha
+    if not np.isnan(x):
+        if weighted != x:
+            weighted = (old_wt * weighted + alpha * x) / (old_wt + alpha)
+        old_wt = 1.0
+    return weighted, old_wt
+
+@njit(cache=True)
+def _compute_recurrences(close):
+    """Compute the recursive indicators in a single pass over close.
+
+    Matches the ta library defaults: Wilder-smoothed RSI and EMA-based MACD
+    (adjust=False), including pandas' handling of NaN closes. Values are NaN
+    until each indicator has seen enough valid inputs.
+    """
+    n = close.size
+    rsi = np.full(n, np.nan)
+    macd = np.full(n, np.nan)
+    macd_signal = np.full(n, np.nan)
+    macd_hist = np.full(n, np.nan)
+    if n == 0:
+        return rsi, macd, macd_signal, macd_hist
+
+    alpha_rsi = 1.0 / RSI_WINDOW
+    alpha_fast = 2.0 / (MACD_FAST + 1)
+    alpha_slow = 2.0 / (MACD_SLOW + 1)
+    alpha_signal = 2.0 / (MACD_SIGNAL + 1)
+
+    avg_up = 0.0
+    avg_down = 0.0
+    ema_fast = np.nan
+    fast_wt = 1.0
+    ema_slow = np.nan
+    slow_wt = 1.0
+    signal = np.nan
+    signal_wt = 1.0
+    close_obs = 0
+    macd_obs = 0
+
+    for i in range(n):
+        c = close[i]
+
+        # RSI: a diff involving a NaN counts as no move, as in ta
+        if i > 0:
+            diff = c - close[i - 1]
+            up = diff if diff > 0 else 0.0
+            down = -diff if diff < 0 else 0.0
+            avg_up = (1.0 - alpha_rsi) * avg_up + alpha_rsi * up
+            avg_down = (1.0 - alpha_rsi) * avg_down + alpha_rsi * down
+        if i >= RSI_WINDOW - 1:
+            rsi[i] = 100.0 if avg_down == 0 else 100.0 - 100.0 / (1.0 + avg_up / avg_down)
+
+        # MACD EMAs skip NaN closes; each needs a full span of valid closes
+        if not np.isnan(c):
+            close_obs += 1
+        ema_fast, fast_wt = _ewm_step(ema_fast, fast_wt, c, alpha_fast)
+        ema_slow, slow_wt = _ewm_step(ema_slow, slow_wt, c, alpha_slow)
+        m = np.nan
+        if close_obs >= MACD_SLOW:
+            m = ema_fast - ema_slow
+            macd[i] = m
+
+        # Signal line is an EMA of MACD, seeded from its first value
+        if not np.isnan(m):
+            macd_obs += 1
+        signal, signal_wt = _ewm_step(signal, signal_wt, m, alpha_signal)
+        if macd_obs >= MACD_SIGNAL:
+            macd_signal[i] = signal
+            macd_hist[i] = m - signal
+
+    return rsi, macd, macd_signal, macd_hist
+
+def compute_indicators(close: np.ndarray) -> Dict[str, np.ndarray]:
+    """Compute all technical indicators for a close price series"""
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    rsi, macd, macd_signal, macd_hist = _compute_recurrences(close)
+    bb_upper, bb_middle, bb_lower = _bollinger(close)
+    return dict(zip(INDICATOR_COLUMNS, (
+        rsi, macd, macd_signal, macd_hist,
+        _sma(close, 20), _sma(close, 50), _sma(close, 200),
+        bb_upper, bb_middle, bb_lower
+    )))
@@ -0,0 +1,28 @@
+from typing import List
+import numpy as np
+
+from services._njit import njit, NUMBA_AVAILABLE
+
+# Compound scores beyond +/- this value are labelled Positive/Negative
+SENTIMENT_THRESHOLD = 0.05
+
+# Indexed by classifier code: 0 -> Neutral, 1 -> Positive, -1 -> Negative
+SENTIMENT_LABELS = ('Neutral', 'Positive', 'Negative')
+
+@njit(cache=True)
+def _classify(scores, out):
+    """Write 1/-1/0 codes for positive/negative/neutral scores into out"""
+    for i in range(scores.size):
+        s = scores[i]
+        out[i] = 1 if s > SENTIMENT_THRESHOLD else (-1 if s < -SENTIMENT_THRESHOLD else 0)
+
+def classify_sentiment(scores: np.ndarray) -> List[str]:
+    """Map an array of sentiment scores to their labels"""
+    # Compare in float64 on both paths so boundary scores get the same label
+    scores = np.asarray(scores, dtype=np.float64)
+    codes = np.empty(scores.size, dtype=np.int8)
+    if NUMBA_AVAILABLE:
+        _classify(scores, codes)
+    else:
+        codes[:] = np.where(scores > SENTIMENT_THRESHOLD, 1, np.where(scores < -SENTIMENT_THRESHOLD, -1, 0))
+    return [SENTIMENT_LABELS[code] for code in codes.tolist()]
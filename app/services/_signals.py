@@ -0,0 +1,13 @@
+from config.config import TECHNICAL_PARAMS
+from services._njit import njit
+
+RSI_OVERBOUGHT = TECHNICAL_PARAMS['RSI']['overbought']
+RSI_OVERSOLD = TECHNICAL_PARAMS['RSI']['oversold']
+
+# Indexed by the codes returned from rsi_state
+RSI_STATES = ('Overbought', 'Oversold', 'Neutral')
+
+@njit(cache=True)
+def rsi_state(rsi):
+    """Return 0/1/2 for an overbought/oversold/neutral RSI value"""
+    return 0 if rsi > RSI_OVERBOUGHT else (1 if rsi < RSI_OVERSOLD else 2)
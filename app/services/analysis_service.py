@@ -1,30 +1,61 @@
+import functools
 import logging
 import os
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
-from textblob import TextBlob
+import numpy as np
 import pandas as pd
+from pyarrow import feather
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 from config.config import config
+from services._sentiment_kernels import classify_sentiment
+from services._signals import RSI_STATES, rsi_state
 from services.data_service import crypto_data_service
 from services.db_service import db_service
-from services.llm_service import llm_service
+from services.llm_service import llm_service, ANALYSIS_UNAVAILABLE
 
 logger = logging.getLogger(__name__)
 
+# Number of distinct market states whose LLM analysis is kept
+LLM_CACHE_SIZE = 256
+
+@functools.lru_cache(maxsize=32)
+def _read_news_backup(path: str, mtime: float) -> List[Dict]:
+    """Load a Feather news backup; mtime is part of the key so a rewritten file is re-read"""
+    return feather.read_table(path).to_pylist()
+
 class CryptoAnalysisService:
     def __init__(self):
         self.api_key = config.api.news_api_key
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+        self._vader = SentimentIntensityAnalyzer()
+        
+        # Recent LLM analyses keyed by _analysis_fingerprint, oldest first
+        self._llm_cache: OrderedDict = OrderedDict()
+        self._llm_cache_lock = threading.Lock()
         
         # Create news data directory if it doesn't exist
         self.news_dir = os.path.join(os.getcwd(), 'data', 'news')
         os.makedirs(self.news_dir, exist_ok=True)
 
-    def _get_news_file_path(self, symbol: str) -> str:
+    def _get_news_file_path(self, symbol: str, file_format: str = 'feather') -> str:
         """Get the path for a news cache file"""
-        return os.path.join(self.news_dir, f"{symbol}_news.csv")
+        return os.path.join(self.news_dir, f"{symbol}_news.{file_format}")
 
     def _should_update_news(self, symbol: str, update_interval_minutes: int = 60) -> bool:
         """Check if news should be updated based on MongoDB timestamp"""
@@ -47,8 +78,12 @@ class CryptoAnalysisService:
             
         try:
             # Calculate average sentiment
-            total_sentiment = sum(item['sentiment'] for item in news_items)
-            avg_sentiment = total_sentiment / len(news_items)
+            scores = np.fromiter(
+                (item['sentiment'] for item in news_items),
+                dtype=np.float64,
+                count=len(news_items)
+            )
+            avg_sentiment = float(scores.mean())
             
             # Classify sentiment
             if avg_sentiment > 0.2:
@@ -83,25 +118,31 @@ class CryptoAnalysisService:
             response = self.session.get(config.api.base_url, params=params)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             if 'feed' not in data:
                 return []
                 
-            news_items = []
-            for item in data['feed']:
-                # Calculate sentiment using TextBlob
-                sentiment = TextBlob(item['title'] + " " + item['summary']).sentiment.polarity
-                
-                news_item = {
-                    'title': item['title'],
-                    'summary': item['summary'],
-                    'url': item['url'],
-                    'source': item['source'],
-                    'timestamp': item['time_published'],
-                    'sentiment': sentiment,
-                    'sentiment_label': 'Positive' if sentiment > 0 else 'Negative' if sentiment < 0 else 'Neutral'
-                }
-                news_items.append(news_item)
+            # Score all articles in one pass with VADER (lexicon lookup, no POS tagging)
+            feed = data['feed']
+            texts = [f"{item['title']} {item['summary']}" for item in feed]
+            scores = np.fromiter(
+                (self._vader.polarity_scores(text)['compound'] for text in texts),
+                dtype=np.float64,
+                count=len(texts)
+            )
+            labels = classify_sentiment(scores)
+            
+            # Build the frame column-wise and derive the records from it once
+            news_df = pd.DataFrame({
+                'title': [item['title'] for item in feed],
+                'summary': [item['summary'] for item in feed],
+                'url': [item['url'] for item in feed],
+                'source': [item['source'] for item in feed],
+                'timestamp': [item['time_published'] for item in feed],
+                'sentiment': scores,
+                'sentiment_label': labels
+            })
+            news_items = news_df.to_dict(orient='records')
             
             # Save to MongoDB
             news_data = {
@@ -111,10 +152,9 @@ class CryptoAnalysisService:
             }
             db_service.save_news_data(symbol, news_data)
             
-            # Save to CSV as backup
-            news_df = pd.DataFrame(news_items)
+            # Save to Feather as backup
             news_file_path = self._get_news_file_path(symbol)
-            news_df.to_csv(news_file_path, index=False)
+            news_df.to_feather(news_file_path, compression='zstd')
             
             return news_items
             
@@ -126,28 +166,76 @@ class CryptoAnalysisService:
                 if cached_news and 'news_items' in cached_news:
                     return cached_news['news_items']
                     
-                # If MongoDB fails, try CSV backup
+                # If MongoDB fails, try Feather backup
                 news_file_path = self._get_news_file_path(symbol)
                 if os.path.exists(news_file_path):
-                    news_df = pd.read_csv(news_file_path)
+                    return _read_news_backup(news_file_path, os.path.getmtime(news_file_path))
+                
+                # Fall back to backups written before the Feather switch
+                legacy_file_path = self._get_news_file_path(symbol, 'csv')
+                if os.path.exists(legacy_file_path):
+                    news_df = pd.read_csv(legacy_file_path)
                     return news_df.to_dict('records')
                     
             except Exception as cache_error:
                 logger.error(f"Error loading cached news: {str(cache_error)}")
             return []
 
-    def generate_market_analysis(self, symbol: str = 'BTC') -> Dict:
+    def prefetch_news(self, symbols: List[str], limit: int = 10) -> Dict[str, List[Dict]]:
+        """Fetch news for several symbols concurrently over the shared session"""
+        if not symbols:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(5, len(symbols))) as executor:
+            results = executor.map(lambda symbol: self.get_crypto_news(symbol, limit), symbols)
+            return dict(zip(symbols, results))
+
+    def _analysis_fingerprint(self, symbol: str, market_data: Dict, news: List[Dict]) -> Tuple:
+        """Build a hashable key from the values the LLM prompt is built from"""
+        return (
+            symbol,
+            round(float(market_data.get('price', 0)), 2),
+            round(float(market_data.get('price_change_24h', 0)), 2),
+            round(float(market_data.get('volume_24h', 0)), 2),
+            round(float(market_data.get('rsi', 0)), 1),
+            market_data.get('macd_signal', 'neutral'),
+            market_data.get('ma_signal', 'neutral'),
+            tuple((item['title'], item['sentiment_label']) for item in news[:3])
+        )
+
+    def _cached_llm_analysis(self, symbol: str, market_data: Dict, news: List[Dict]) -> str:
+        """Run the LLM once per distinct market state; failed generations are not kept"""
+        key = self._analysis_fingerprint(symbol, market_data, news)
+        with self._llm_cache_lock:
+            if key in self._llm_cache:
+                self._llm_cache.move_to_end(key)
+                return self._llm_cache[key]
+        
+        llm_analysis = llm_service.generate_analysis(market_data, news)
+        if llm_analysis != ANALYSIS_UNAVAILABLE:
+            with self._llm_cache_lock:
+                self._llm_cache[key] = llm_analysis
+                if len(self._llm_cache) > LLM_CACHE_SIZE:
+                    self._llm_cache.popitem(last=False)
+        return llm_analysis
+
+    def get_analysis_key(self, symbol: str, market_data: Dict) -> Tuple:
+        """Hashable key of the current analysis inputs, for caching whole analyses"""
+        return self._analysis_fingerprint(symbol, market_data or {}, self.get_crypto_news(symbol))
+
+    def generate_market_analysis(self, symbol: str = 'BTC', market_data: Optional[Dict] = None) -> Dict:
         """Generate comprehensive market analysis using LLM"""
         try:
-            # Get market data
-            market_data = crypto_data_service.get_market_summary(symbol)
-            news = self.get_crypto_news(symbol)
-            
+            # Get market data unless the caller already has it
+            if market_data is None:
+                market_data = crypto_data_service.get_market_summary(symbol)
             if not market_data:
                 return {}
             
-            # Get LLM analysis
-            llm_analysis = llm_service.generate_analysis(market_data, news)
+            news = self.get_crypto_news(symbol)
+            
+            # Get LLM analysis, reusing it when the prompt inputs are unchanged
+            llm_analysis = self._cached_llm_analysis(symbol, market_data, news)
             
             # Combine with regular analysis
             analysis = {
@@ -158,7 +246,7 @@ class CryptoAnalysisService:
                     'trend': market_data.get('ma_signal', 'neutral'),
                 },
                 'technical_indicators': {
-                    'rsi_condition': 'Overbought' if market_data.get('rsi', 0) > 70 else 'Oversold' if market_data.get('rsi', 0) < 30 else 'Neutral',
+                    'rsi_condition': RSI_STATES[rsi_state(float(market_data.get('rsi', 0)))],
                     'macd_signal': market_data.get('macd_signal', 'neutral'),
                 },
                 'market_sentiment': {
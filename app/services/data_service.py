@@ -1,20 +1,40 @@
 import logging
 import os
-from typing import Dict, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import orjson
 import pandas as pd
-import requests
+import pyarrow as pa
+import pyarrow.dataset as pads
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
-import ta
+from services._indicators import compute_indicators
 from services.db_service import db_service
 from config.config import config
 
 logger = logging.getLogger(__name__)
 
+# Hours before stored market data is considered stale
+UPDATE_INTERVAL_HOURS = 24
+
+# Seconds a staleness check result is reused within one user action
+STALE_CHECK_TTL = 5
+# Request only the compact series when the stored history is newer than this
+COMPACT_FETCH_DAYS = 90
+# Alpha Vantage's compact output holds at most this many days
+COMPACT_ROWS = 100
+
 class CryptoDataService:
     def __init__(self):
         self.api_key = config.api.alpha_vantage_key
         self.base_url = config.api.base_url
-        self.session = requests.Session()
+        
+        # symbol -> (checked_at, should_update), see _should_update_data
+        self._stale_cache: Dict[str, Tuple[float, bool]] = {}
         
         # Create data directories if they don't exist
         self.data_dir = os.path.join(os.getcwd(), 'data')
@@ -23,168 +43,227 @@ class CryptoDataService:
         
         os.makedirs(self.raw_data_dir, exist_ok=True)
         os.makedirs(self.processed_data_dir, exist_ok=True)
+        
+        # Keep-alive session with a SQLite response cache; only successful
+        # time series payloads are cached, not rate-limit notes
+        self.session = requests_cache.CachedSession(
+            os.path.join(self.data_dir, 'av_cache'),
+            expire_after=timedelta(hours=UPDATE_INTERVAL_HOURS),
+            filter_fn=lambda response: b'Time Series' in response.content
+        )
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip', 'Connection': 'keep-alive'})
 
-    def _get_csv_path(self, symbol: str, data_type: str) -> str:
-        """Get the path for a CSV file"""
+    def _get_frame_path(self, symbol: str, data_type: str, file_format: str = 'parquet') -> str:
+        """Get the path for a saved DataFrame file"""
         if data_type == 'raw':
-            return os.path.join(self.raw_data_dir, f"{symbol}_historical.csv")
-        return os.path.join(self.processed_data_dir, f"{symbol}_processed.csv")
+            return os.path.join(self.raw_data_dir, f"{symbol}_historical.{file_format}")
+        return os.path.join(self.processed_data_dir, f"{symbol}_processed.{file_format}")
+
+    def _get_dataset_path(self, symbol: str) -> str:
+        """Get the directory of a symbol's year-partitioned raw Parquet dataset"""
+        return os.path.join(self.raw_data_dir, f"symbol={symbol}")
+
+    def _save_raw_dataset(self, symbol: str, df: pd.DataFrame, last_saved: Optional[datetime]) -> None:
+        """Rewrite only the year partitions holding rows from last_saved onward"""
+        dataset_path = self._get_dataset_path(symbol)
+        if last_saved is not None and os.path.isdir(dataset_path):
+            df = df[df.index.year >= last_saved.year]
+        
+        frame = df.rename_axis('date').reset_index()
+        frame['year'] = frame['date'].dt.year
+        pads.write_dataset(
+            pa.Table.from_pandas(frame, preserve_index=False),
+            dataset_path,
+            format='parquet',
+            partitioning=['year'],
+            partitioning_flavor='hive',
+            existing_data_behavior='delete_matching',
+            file_options=pads.ParquetFileFormat().make_write_options(compression='zstd')
+        )
+
+    def _load_raw_dataset(self, symbol: str) -> pd.DataFrame:
+        """Load a symbol's year-partitioned raw Parquet dataset"""
+        dataset = pads.dataset(self._get_dataset_path(symbol), format='parquet', partitioning='hive')
+        columns = [name for name in dataset.schema.names if name != 'year']
+        # Nothing else references the table, so self_destruct can free each Arrow
+        # column as soon as pandas has taken it
+        df = dataset.to_table(columns=columns).to_pandas(split_blocks=True, self_destruct=True).set_index('date').sort_index()
+        df.index.name = None
+        return df
+
+    def _load_frame(self, symbol: str, data_type: str) -> Optional[pd.DataFrame]:
+        """Load a saved DataFrame, preferring Parquet over legacy CSV files"""
+        if data_type == 'raw' and os.path.isdir(self._get_dataset_path(symbol)):
+            return self._load_raw_dataset(symbol)
+        
+        parquet_path = self._get_frame_path(symbol, data_type)
+        if os.path.exists(parquet_path):
+            return pd.read_parquet(parquet_path)
+        
+        csv_path = self._get_frame_path(symbol, data_type, 'csv')
+        if os.path.exists(csv_path):
+            return pd.read_csv(csv_path, index_col=0, parse_dates=True)
+        return None
 
-    def _should_update_data(self, symbol: str, update_interval_hours: int = 24) -> bool:
+    def _should_update_data(self, symbol: str, update_interval_hours: int = UPDATE_INTERVAL_HOURS) -> bool:
         """Check if data should be updated based on MongoDB timestamp"""
-        latest_data = db_service.get_latest_processed_data(symbol)
-        if not latest_data:
-            return True
-            
-        last_update = latest_data['timestamp']
-        elapsed_time = datetime.now() - last_update
-        return elapsed_time.total_seconds() > (update_interval_hours * 3600)
+        # Reuse a very recent answer so one call chain hits MongoDB once
+        cached = self._stale_cache.get(symbol)
+        if cached and time.monotonic() - cached[0] < STALE_CHECK_TTL:
+            return cached[1]
+        
+        last_update = db_service.get_latest_timestamp(symbol)
+        if not last_update:
+            should_update = True
+        else:
+            elapsed_time = datetime.now() - last_update
+            should_update = elapsed_time.total_seconds() > (update_interval_hours * 3600)
+        
+        self._stale_cache[symbol] = (time.monotonic(), should_update)
+        return should_update
     
-    def _prepare_data_for_mongodb(self, df: pd.DataFrame) -> dict:
-        """Convert DataFrame to MongoDB-compatible format"""
-        # Convert DataFrame to dictionary with string dates
-        data_dict = {}
-        for idx, row in df.iterrows():
-            date_str = idx.strftime('%Y-%m-%d %H:%M:%S')
-            # Convert numpy/pandas types to native Python types
-            row_dict = {}
-            for key, value in row.items():
-                if pd.isna(value):
-                    row_dict[key] = None
-                else:
-                    row_dict[key] = float(value)
-            data_dict[date_str] = row_dict
-        return data_dict
+    def _prepare_data_for_mongodb(self, df: pd.DataFrame) -> List[Dict]:
+        """Convert DataFrame rows to MongoDB-compatible documents"""
+        # Box the whole block to native floats once and blank NaNs with a single mask
+        arr = df.to_numpy(dtype=np.float64)
+        values = arr.astype(object)
+        values[np.isnan(arr)] = None
+        columns = df.columns.tolist()
+        return [{'date': date, **dict(zip(columns, row))} for date, row in zip(df.index.to_pydatetime(), values.tolist())]
+
+    def _rows_to_save(self, df: pd.DataFrame, last_saved: Optional[datetime]) -> pd.DataFrame:
+        """Rows from the last stored date onward; that row may have been a partial day"""
+        if last_saved is None:
+            return df
+        return df.iloc[df.index.searchsorted(last_saved):]
 
     def fetch_and_save_historical_data(self, symbol: str = 'BTC', 
                                  market: str = 'USD', 
                                  force_update: bool = False) -> Optional[pd.DataFrame]:
-        """Fetch historical data and save to both CSV and MongoDB"""
-        csv_path = self._get_csv_path(symbol, 'raw')
-        
+        """Fetch historical data and save to both Parquet and MongoDB"""
         # Check if we need to update the data
         if not force_update and not self._should_update_data(symbol):
             logger.info(f"Loading cached data for {symbol}")
-            latest_data = db_service.get_latest_historical_data(symbol)
-            if latest_data:
-                # Convert string dates back to datetime index
-                data_dict = latest_data['data']
-                df = pd.DataFrame.from_dict(data_dict, orient='index')
-                df.index = pd.to_datetime(df.index)
+            df = self._load_data_from_mongodb(db_service.get_historical_rows(symbol))
+            if df is not None:
                 return df
 
         try:
+            last_saved = db_service.get_latest_historical_date(symbol)
+            incremental = last_saved is not None and datetime.now() - last_saved < timedelta(days=COMPACT_FETCH_DAYS)
+            
             params = {
                 'function': 'DIGITAL_CURRENCY_DAILY',
                 'symbol': symbol,
                 'market': market,
+                'outputsize': 'compact' if incremental else 'full',
                 'apikey': self.api_key
             }
             print("Hitting the endpoint")
-            response = self.session.get(self.base_url, params=params)
+            response = self.session.get(self.base_url, params=params, force_refresh=force_update)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if 'Time Series (Digital Currency Daily)' not in data:
                 logger.error(f"Unexpected response format for {symbol}: {data}")
                 return None
             
-            df = pd.DataFrame.from_dict(
-                data['Time Series (Digital Currency Daily)'],
-                orient='index'
-            )
+            time_series = data['Time Series (Digital Currency Daily)']
+            fields = list(next(iter(time_series.values()), {}))
             
-            # Clean column names and convert to numeric
-            df.columns = [col.split('. ')[1] for col in df.columns]
-            df = df.apply(pd.to_numeric)
+            # Parse straight into one float64 buffer instead of inferring per column
+            values = np.fromiter(
+                (float(day[field]) for day in time_series.values() for field in fields),
+                dtype=np.float64,
+                count=len(time_series) * len(fields)
+            ).reshape(-1, len(fields))
             
-            # Add date as index
-            df.index = pd.to_datetime(df.index)
+            # Clean column names and add date as index
+            df = pd.DataFrame(
+                values,
+                index=pd.DatetimeIndex(np.array(list(time_series), dtype='datetime64[us]')),
+                columns=[field.split('. ')[1] for field in fields]
+            )
             df = df.sort_index()
             
-            # Save to CSV
-            logger.info(f"Saving data for {symbol} to CSV")
-            df.to_csv(csv_path)
+            # Splice the recent rows onto the stored history; DIGITAL_CURRENCY_DAILY
+            # doesn't document outputsize, so a full payload needs no splice
+            if incremental and len(df) <= COMPACT_ROWS:
+                existing = self._load_saved_history(symbol)
+                if existing is not None:
+                    df = df.combine_first(existing)
+            
+            # Save changed years to the Parquet dataset
+            logger.info(f"Saving data for {symbol} to Parquet")
+            self._save_raw_dataset(symbol, df, last_saved)
             
-            # Save to MongoDB with prepared data
+            # Save new rows to MongoDB
             logger.info(f"Saving data for {symbol} to MongoDB")
-            mongo_data = self._prepare_data_for_mongodb(df)
-            db_service.save_historical_data(symbol, {
-                'data': mongo_data,
-                'market': market
-            })
+            new_rows = self._rows_to_save(df, last_saved)
+            db_service.save_historical_data(symbol, self._prepare_data_for_mongodb(new_rows), market)
             
             return df
             
         except Exception as e:
             logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
-            # Try to load cached data
-            latest_data = db_service.get_latest_historical_data(symbol)
-            if latest_data:
-                data_dict = latest_data['data']
-                df = pd.DataFrame.from_dict(data_dict, orient='index')
-                df.index = pd.to_datetime(df.index)
-                return df
-            return None
+            return self._load_saved_history(symbol)
+
+    def _load_saved_history(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Load stored raw history from MongoDB, then the local files"""
+        df = self._load_data_from_mongodb(db_service.get_historical_rows(symbol))
+        if df is None:
+            df = self._load_frame(symbol, 'raw')
+        return df
         
-    def _load_data_from_mongodb(self, mongodb_data: dict) -> pd.DataFrame:
-        """Convert MongoDB data back to DataFrame with proper datetime index"""
-        if not mongodb_data or 'data' not in mongodb_data:
+    def _load_data_from_mongodb(self, rows: List[Dict]) -> Optional[pd.DataFrame]:
+        """Convert MongoDB row documents back to DataFrame with proper datetime index"""
+        if not rows:
             return None
             
-        # Convert the data back to DataFrame
-        df_dict = mongodb_data['data']
-        df = pd.DataFrame.from_dict(df_dict, orient='index')
-        
-        # Convert index to datetime
-        df.index = pd.to_datetime(df.index)
-        
-        # Sort by date
-        df = df.sort_index()
+        # Build one typed buffer per column; rows come back sorted by date
+        n = len(rows)
+        dates = np.fromiter((row['date'] for row in rows), dtype='datetime64[us]', count=n)
+        columns = [column for column in rows[0] if column != 'date']
+        data = {
+            column: np.fromiter(
+                (np.nan if (value := row.get(column)) is None else value for row in rows),
+                dtype=np.float64,
+                count=n
+            )
+            for column in columns
+        }
         
-        return df
+        return pd.DataFrame(data, index=pd.DatetimeIndex(dates))
     
     def calculate_technical_indicators(self, df: pd.DataFrame, symbol: str) -> pd.DataFrame:
         """Calculate technical indicators and save to MongoDB"""
         try:
             if 'close' in df.columns:
-                # RSI
-                df['RSI'] = ta.momentum.RSIIndicator(df['close']).rsi()
-                
-                # MACD
-                macd = ta.trend.MACD(df['close'])
-                df['MACD'] = macd.macd()
-                df['MACD_Signal'] = macd.macd_signal()
-                df['MACD_Hist'] = macd.macd_diff()
-                
-                # Moving Averages
-                df['MA20'] = ta.trend.SMAIndicator(df['close'], window=20).sma_indicator()
-                df['MA50'] = ta.trend.SMAIndicator(df['close'], window=50).sma_indicator()
-                df['MA200'] = ta.trend.SMAIndicator(df['close'], window=200).sma_indicator()
-                
-                # Bollinger Bands
-                bollinger = ta.volatility.BollingerBands(df['close'])
-                df['BB_Upper'] = bollinger.bollinger_hband()
-                df['BB_Middle'] = bollinger.bollinger_mavg()
-                df['BB_Lower'] = bollinger.bollinger_lband()
+                # RSI, MACD, moving averages and Bollinger Bands in one pass
+                for column, values in compute_indicators(df['close'].to_numpy()).items():
+                    df[column] = values
                 
-                # Save to CSV and MongoDB
-                processed_csv_path = self._get_csv_path(symbol, 'processed')
-                df.to_csv(processed_csv_path)
+                # Save to Parquet and MongoDB
+                processed_path = self._get_frame_path(symbol, 'processed')
+                df.to_parquet(processed_path, compression='zstd', engine='pyarrow')
                 
-                # Prepare data for MongoDB
-                mongo_data = self._prepare_data_for_mongodb(df)
+                # Prepare new rows for MongoDB
+                new_rows = self._rows_to_save(df, db_service.get_latest_processed_date(symbol))
                 
                 # Save to MongoDB with last indicators
-                db_service.save_processed_data(symbol, {
-                    'data': mongo_data,
-                    'indicators': {
-                        'last_rsi': float(df['RSI'].iloc[-1]),
-                        'last_macd': float(df['MACD'].iloc[-1]),
-                        'last_macd_signal': float(df['MACD_Signal'].iloc[-1])
-                    }
+                db_service.save_processed_data(symbol, self._prepare_data_for_mongodb(new_rows), {
+                    'last_rsi': float(df['RSI'].iloc[-1]),
+                    'last_macd': float(df['MACD'].iloc[-1]),
+                    'last_macd_signal': float(df['MACD_Signal'].iloc[-1])
                 })
+                self._stale_cache.pop(symbol, None)
             
             return df
             
@@ -196,10 +275,10 @@ class CryptoDataService:
                        market: str = 'USD', 
                        force_update: bool = False) -> Optional[pd.DataFrame]:
         """Get historical data from MongoDB or API"""
-        if not force_update:
-            latest_data = db_service.get_latest_processed_data(symbol)
-            if latest_data and not self._should_update_data(symbol):
-                return self._load_data_from_mongodb(latest_data)
+        if not force_update and not self._should_update_data(symbol):
+            df = self._load_data_from_mongodb(db_service.get_processed_rows(symbol))
+            if df is not None:
+                return df
         
         df = self.fetch_and_save_historical_data(symbol, market, force_update)
         if df is not None:
@@ -234,10 +313,13 @@ class CryptoDataService:
 
     def get_multi_symbol_data(self, symbols: List[str], force_update: bool = False) -> Dict[str, Dict]:
         """Get data for multiple symbols"""
-        return {
-            symbol: self.get_market_summary(symbol, force_update)
-            for symbol in symbols
-        }
+        if not symbols:
+            return {}
+        
+        # Each summary is network-bound, so overlap them on the shared session
+        with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as executor:
+            results = executor.map(lambda symbol: self.get_market_summary(symbol, force_update), symbols)
+            return dict(zip(symbols, results))
 
 # Create global instance
 crypto_data_service = CryptoDataService()
\ No newline at end of file
@@ -1,75 +1,214 @@
 from typing import Dict, Optional, List
+import atexit
 import logging
+import queue
+import threading
 from datetime import datetime
 import pymongo
-from pymongo import MongoClient
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import InsertOne, MongoClient, UpdateOne
 from pymongo.collection import Collection
 from pymongo.database import Database
+from pymongo.errors import OperationFailure
 
 logger = logging.getLogger(__name__)
 
+# Queued writes are flushed once this many operations are pending or the queue idles this long
+WRITE_BATCH_SIZE = 500
+WRITE_BATCH_WAIT = 0.05
+
 class MongoDBService:
     def __init__(self):
+        # A single client is shared app-wide; pymongo's default pool (100 connections)
+        # already covers the worker threads and the background writer
         self.client: MongoClient = MongoClient('mongodb://localhost:27017/')
         self.db: Database = self.client['crypto_assistant']
         self.historical_data: Collection = self.db['historical_data']
         self.processed_data: Collection = self.db['processed_data']
         self.news_data: Collection = self.db['news_data']
         
-        # Create indexes
-        self.historical_data.create_index([('symbol', pymongo.ASCENDING), ('timestamp', pymongo.ASCENDING)])
-        self.processed_data.create_index([('symbol', pymongo.ASCENDING), ('timestamp', pymongo.ASCENDING)])
-        self.news_data.create_index([('symbol', pymongo.ASCENDING), ('timestamp', pymongo.ASCENDING)])
+        # Read-only view of processed_data that leaves documents as undecoded BSON
+        self.raw_processed: Collection = self.db.get_collection(
+            'processed_data',
+            codec_options=CodecOptions(document_class=RawBSONDocument)
+        )
+        
+        # One document per (symbol, date) row; historical_data/processed_data
+        # only hold a small record of each save
+        self.historical_rows: Collection = self.db['historical_rows']
+        self.processed_rows: Collection = self.db['processed_rows']
+        
+        # Create indexes matching the latest-first reads, replacing the ascending ones
+        for collection in (self.historical_data, self.processed_data, self.news_data):
+            try:
+                collection.drop_index('symbol_1_timestamp_1')
+            except OperationFailure:
+                pass
+            collection.create_index([('symbol', pymongo.ASCENDING), ('timestamp', pymongo.DESCENDING)])
+        self.historical_rows.create_index([('symbol', pymongo.ASCENDING), ('date', pymongo.ASCENDING)], unique=True)
+        self.processed_rows.create_index([('symbol', pymongo.ASCENDING), ('date', pymongo.ASCENDING)], unique=True)
+        
+        # Reap processed-data records after 30 days
+        self.processed_data.create_index('timestamp', expireAfterSeconds=30 * 86400)
+        
+        # Saves are applied by a background writer so callers don't wait on MongoDB
+        self._write_q: queue.Queue = queue.Queue()
+        # Queued-but-unapplied write batches per collection name, so a read only
+        # waits for writes to the collection it reads
+        self._pending: Dict[str, int] = {}
+        self._pending_cond = threading.Condition()
+        threading.Thread(target=self._drain, daemon=True).start()
+        # The writer is a daemon thread, so apply anything still queued at shutdown
+        atexit.register(self.flush)
+
+    def _drain(self) -> None:
+        """Apply queued writes as unordered bulk writes, one per collection"""
+        while True:
+            batch = [self._write_q.get()]
+            pending = len(batch[0][1])
+            try:
+                while pending < WRITE_BATCH_SIZE:
+                    batch.append(self._write_q.get(timeout=WRITE_BATCH_WAIT))
+                    pending += len(batch[-1][1])
+            except queue.Empty:
+                pass
+            
+            operations: Dict[Collection, List] = {}
+            batches: Dict[Collection, int] = {}
+            for collection, ops in batch:
+                operations.setdefault(collection, []).extend(ops)
+                batches[collection] = batches.get(collection, 0) + 1
+            
+            for collection, ops in operations.items():
+                try:
+                    collection.bulk_write(ops, ordered=False)
+                except Exception as e:
+                    logger.error(f"Error writing to MongoDB collection {collection.name}: {str(e)}")
+                with self._pending_cond:
+                    self._pending[collection.name] -= batches[collection]
+                    self._pending_cond.notify_all()
+
+    def _enqueue(self, collection: Collection, ops: List) -> None:
+        """Queue write operations for the background writer"""
+        if ops:
+            with self._pending_cond:
+                self._pending[collection.name] = self._pending.get(collection.name, 0) + 1
+            self._write_q.put((collection, ops))
 
-    def save_historical_data(self, symbol: str, data: Dict) -> bool:
-        """Save historical data to MongoDB"""
+    def flush(self, collection: Optional[Collection] = None) -> None:
+        """Block until queued writes to collection (or to every collection) have been applied"""
+        with self._pending_cond:
+            if collection is None:
+                self._pending_cond.wait_for(lambda: not any(self._pending.values()))
+            else:
+                self._pending_cond.wait_for(lambda: not self._pending.get(collection.name))
+
+    def _upsert_rows(self, collection: Collection, symbol: str, rows: List[Dict]) -> None:
+        """Queue upserts of per-date row documents for a symbol"""
+        self._enqueue(collection, [
+            UpdateOne({'symbol': symbol, 'date': row['date']}, {'$set': row}, upsert=True)
+            for row in rows
+        ])
+
+    def _get_rows(self, collection: Collection, symbol: str) -> List[Dict]:
+        """Get all row documents for a symbol in date order"""
+        self.flush(collection)
+        cursor = collection.find(
+            {'symbol': symbol},
+            {'_id': 0, 'symbol': 0}
+        ).sort('date', pymongo.ASCENDING)
+        return list(cursor)
+
+    def _get_latest_row_date(self, collection: Collection, symbol: str) -> Optional[datetime]:
+        """Get the date of the most recent stored row for a symbol"""
+        self.flush(collection)
+        row = collection.find_one(
+            {'symbol': symbol},
+            {'date': 1, '_id': 0},
+            sort=[('date', pymongo.DESCENDING)]
+        )
+        return row['date'] if row else None
+
+    def save_historical_data(self, symbol: str, rows: List[Dict], market: str = 'USD') -> bool:
+        """Queue historical data rows for saving to MongoDB; True means queued, not yet written"""
         try:
-            data['symbol'] = symbol
-            data['timestamp'] = datetime.now()
-            self.historical_data.insert_one(data)
+            self._upsert_rows(self.historical_rows, symbol, rows)
+            self._enqueue(self.historical_data, [InsertOne({
+                'symbol': symbol,
+                'market': market,
+                'timestamp': datetime.now()
+            })])
             return True
         except Exception as e:
             logger.error(f"Error saving historical data to MongoDB: {str(e)}")
             return False
 
-    def save_processed_data(self, symbol: str, data: Dict) -> bool:
-        """Save processed data to MongoDB"""
+    def save_processed_data(self, symbol: str, rows: List[Dict], indicators: Dict) -> bool:
+        """Queue processed data rows and latest indicators for MongoDB; True means queued, not yet written"""
         try:
-            data['symbol'] = symbol
-            data['timestamp'] = datetime.now()
-            self.processed_data.insert_one(data)
+            self._upsert_rows(self.processed_rows, symbol, rows)
+            self._enqueue(self.processed_data, [InsertOne({
+                'symbol': symbol,
+                'indicators': indicators,
+                'timestamp': datetime.now()
+            })])
             return True
         except Exception as e:
             logger.error(f"Error saving processed data to MongoDB: {str(e)}")
             return False
 
-    def get_latest_historical_data(self, symbol: str) -> Optional[Dict]:
-        """Get the most recent historical data for a symbol"""
+    def get_historical_rows(self, symbol: str) -> List[Dict]:
+        """Get all historical data rows for a symbol"""
         try:
-            data = self.historical_data.find_one(
-                {'symbol': symbol},
-                sort=[('timestamp', pymongo.DESCENDING)]
-            )
-            return data
+            return self._get_rows(self.historical_rows, symbol)
+        except Exception as e:
+            logger.error(f"Error retrieving historical rows from MongoDB: {str(e)}")
+            return []
+
+    def get_processed_rows(self, symbol: str) -> List[Dict]:
+        """Get all processed data rows for a symbol"""
+        try:
+            return self._get_rows(self.processed_rows, symbol)
+        except Exception as e:
+            logger.error(f"Error retrieving processed rows from MongoDB: {str(e)}")
+            return []
+
+    def get_latest_historical_date(self, symbol: str) -> Optional[datetime]:
+        """Get the date of the most recent historical row for a symbol"""
+        try:
+            return self._get_latest_row_date(self.historical_rows, symbol)
+        except Exception as e:
+            logger.error(f"Error retrieving latest historical date from MongoDB: {str(e)}")
+            return None
+
+    def get_latest_processed_date(self, symbol: str) -> Optional[datetime]:
+        """Get the date of the most recent processed row for a symbol"""
+        try:
+            return self._get_latest_row_date(self.processed_rows, symbol)
         except Exception as e:
-            logger.error(f"Error retrieving historical data from MongoDB: {str(e)}")
+            logger.error(f"Error retrieving latest processed date from MongoDB: {str(e)}")
             return None
 
-    def get_latest_processed_data(self, symbol: str) -> Optional[Dict]:
-        """Get the most recent processed data for a symbol"""
+    def get_latest_timestamp(self, symbol: str) -> Optional[datetime]:
+        """Get the time of the most recent processed data save for a symbol"""
         try:
-            data = self.processed_data.find_one(
+            self.flush(self.processed_data)
+            # Only the timestamp field is ever decoded
+            data = self.raw_processed.find_one(
                 {'symbol': symbol},
+                {'timestamp': 1, '_id': 0},
                 sort=[('timestamp', pymongo.DESCENDING)]
             )
-            return data
+            return data['timestamp'] if data else None
         except Exception as e:
-            logger.error(f"Error retrieving processed data from MongoDB: {str(e)}")
+            logger.error(f"Error retrieving latest timestamp from MongoDB: {str(e)}")
             return None
 
     def get_symbols(self) -> List[str]:
         """Get list of available symbols"""
         try:
+            self.flush(self.historical_data)
             symbols = self.historical_data.distinct('symbol')
             return list(symbols)
         except Exception as e:
@@ -1,5 +1,6 @@
 import logging
 from typing import Dict, Optional
+import numpy as np
 import pandas as pd
 from nixtla import NixtlaClient
 import plotly.graph_objects as go
@@ -16,31 +17,11 @@ class ForecastService:
     def prepare_data_for_forecast(self, df: pd.DataFrame) -> pd.DataFrame:
         """Prepare data for forecast"""
         try:
-            logger.info(f"Input DataFrame columns: {df.columns.tolist()}")
-            logger.info(f"Input DataFrame shape: {df.shape}")
-            
-            # Create a new DataFrame with the required format
-            forecast_df = pd.DataFrame()
-            
-            # Convert index to datetime if it's not already
-            if not isinstance(df.index, pd.DatetimeIndex):
-                df.index = pd.to_datetime(df.index)
-            
-            # Create the forecast DataFrame
-            forecast_df['ds'] = df.index
-            forecast_df['y'] = df['close'].values  # Use .values to ensure proper assignment
-            
-            # Sort by date and reset index
-            forecast_df = forecast_df.sort_values('ds').reset_index(drop=True)
-            
-            # Drop any NaN values
-            forecast_df = forecast_df.dropna()
-            
-            logger.info(f"Prepared DataFrame columns: {forecast_df.columns.tolist()}")
-            logger.info(f"Prepared DataFrame head:\n{forecast_df.head()}")
-            logger.info(f"Number of NaN values in y: {forecast_df['y'].isna().sum()}")
-            
-            return forecast_df
+            # Input is already date-indexed and sorted, so build the frame in one shot
+            return pd.DataFrame({
+                'ds': df.index.to_numpy(),
+                'y': df['close'].to_numpy()
+            }).dropna(subset=['y'])
             
         except Exception as e:
             logger.error(f"Error preparing forecast data: {str(e)}")
@@ -64,6 +45,10 @@ class ForecastService:
             if df['close'].isna().all():
                 logger.error("All close prices are NaN")
                 return None
+            
+            if not isinstance(df.index, pd.DatetimeIndex):
+                logger.error("Input DataFrame must have a DatetimeIndex")
+                return None
                 
             # Prepare data
             forecast_df = self.prepare_data_for_forecast(df)
@@ -75,7 +60,6 @@ class ForecastService:
                 return None
                 
             logger.info("Generating forecast with data shape: {}".format(forecast_df.shape))
-            logger.info(f"Sample of prepared data:\n{forecast_df.head()}")
             
             # Generate forecast
             forecast = self.client.forecast(
@@ -122,70 +106,65 @@ class ForecastService:
                            selected_crypto: str) -> go.Figure:
         """Create a plotly figure with historical data and forecast"""
         try:
-            fig = go.Figure()
-            
-            # Add historical prices
-            fig.add_trace(go.Scatter(
-                x=historical_df.index,
-                y=historical_df['close'],
-                name='Historical',
-                line=dict(color='blue')
-            ))
-            
             forecast_df = forecast_result['forecast_df']
             
-            # Add forecast
-            fig.add_trace(go.Scatter(
-                x=forecast_df['ds'],
-                y=forecast_df['y'],  # Use renamed column
-                name='Forecast',
-                line=dict(color='red', dash='dash')
-            ))
+            # Convert the x axes once instead of letting Plotly infer them per trace
+            history_x = historical_df.index.to_numpy(dtype='datetime64[ns]')
+            forecast_x = forecast_df['ds'].to_numpy(dtype='datetime64[ns]')
+            
+            # Historical prices and forecast; SVG so the range slider can preview them
+            traces = [
+                go.Scatter(
+                    x=history_x,
+                    y=historical_df['close'].to_numpy(),
+                    name='Historical',
+                    line=dict(color='blue')
+                ),
+                go.Scatter(
+                    x=forecast_x,
+                    y=forecast_df['y'].to_numpy(),  # Use renamed column
+                    name='Forecast',
+                    line=dict(color='red', dash='dash')
+                )
+            ]
             
-            # Add confidence intervals if available
+            # Add each confidence interval as one closed band: upper bound out, lower bound back
+            band_x = np.concatenate([forecast_x, forecast_x[::-1]])
             for level in [80, 95]:
                 low_col = f'low_{level}'
                 high_col = f'high_{level}'
                 if low_col in forecast_df.columns and high_col in forecast_df.columns:
-                    fig.add_trace(go.Scatter(
-                        x=forecast_df['ds'],
-                        y=forecast_df[low_col],
-                        name=f'{level}% Lower Bound',
-                        line=dict(width=0),
-                        showlegend=False
-                    ))
-                    
-                    fig.add_trace(go.Scatter(
-                        x=forecast_df['ds'],
-                        y=forecast_df[high_col],
+                    traces.append(go.Scatter(
+                        x=band_x,
+                        y=np.concatenate([forecast_df[high_col].to_numpy(), forecast_df[low_col].to_numpy()[::-1]]),
                         name=f'{level}% Confidence Interval',
-                        fill='tonexty',
+                        fill='toself',
                         fillcolor=f'rgba(0, 100, 255, 0.{level-70})',
-                        line=dict(width=0)
+                        line=dict(width=0),
+                        hoverinfo='skip'
                     ))
             
-            # Update layout
-            fig.update_layout(
-                title=f"{selected_crypto} Price Forecast",
-                xaxis_title="Date",
-                yaxis_title="Price (USD)",
-                height=500,
-                template='plotly_dark',
-                hovermode='x unified',
-                showlegend=True,
-                legend=dict(
-                    yanchor="top",
-                    y=0.99,
-                    xanchor="left",
-                    x=0.01
+            # Build the figure once with its layout and range slider
+            return go.Figure(
+                data=traces,
+                layout=go.Layout(
+                    title=f"{selected_crypto} Price Forecast",
+                    xaxis_title="Date",
+                    yaxis_title="Price (USD)",
+                    height=500,
+                    template='plotly_dark',
+                    hovermode='x unified',
+                    showlegend=True,
+                    legend=dict(
+                        yanchor="top",
+                        y=0.99,
+                        xanchor="left",
+                        x=0.01
+                    ),
+                    xaxis_rangeslider_visible=True
                 )
             )
             
-            # Add range slider
-            fig.update_xaxes(rangeslider_visible=True)
-            
-            return fig
-            
         except Exception as e:
             logger.error(f"Error creating forecast plot: {str(e)}")
             return None
@@ -8,6 +8,9 @@ from langchain.memory import ConversationBufferMemory
 
 logger = logging.getLogger(__name__)
 
+# Returned by generate_analysis when the LLM call fails
+ANALYSIS_UNAVAILABLE = "Sorry, I couldn't generate the analysis at the moment."
+
 class CryptoLLMService:
     def __init__(self):
         # Initialize Ollama LLM
@@ -89,7 +92,7 @@ class CryptoLLMService:
             
         except Exception as e:
             logger.error(f"Error generating analysis: {str(e)}")
-            return "Sorry, I couldn't generate the analysis at the moment."
+            return ANALYSIS_UNAVAILABLE
 
     def get_chat_response(self, user_message: str, market_context: Dict) -> str:
         """Get chat response using LLM"""